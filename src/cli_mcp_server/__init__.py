@@ -1,10 +1,21 @@
 import asyncio
+import sys
 
 from . import server
 
 
 def main():
     """Main entry point for the package."""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            # Optional libuv-backed event loop, installed via the 'uvloop' extra
+            uvloop.run(server.main())
+            return
+
     asyncio.run(server.main())
 
 
@@ -1,8 +1,10 @@
 import os
 import re
 import shlex
+import shutil
 import subprocess
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 
 import mcp.server.stdio
@@ -12,6 +14,16 @@ from mcp.server.models import InitializationOptions
 
 server = Server("cli-mcp-server")
 
+# Shell operators we don't support, longest first so '>>' is reported rather than '>'
+_SHELL_OPERATOR_RE = re.compile(r"&&|\|\||>>|<<|[|><;]")
+
+# Quoting and escapes need shlex; without them a command splits on shlex's whitespace characters alone
+_SHLEX_QUOTING_RE = re.compile(r"['\"\\]")
+_PLAIN_TOKEN_RE = re.compile(r"[^ \t\r\n]+")
+
+# Classifies an argument in one match: flags start with '-', paths are '.', '..' or contain a separator
+_ARG_KIND_RE = re.compile(r"(?P<flag>-)|(?P<path>\.\.?\Z|[^/\\]*[/\\])")
+
 
 class CommandError(Exception):
     """Base exception for command-related errors"""
@@ -37,25 +49,30 @@ class CommandTimeoutError(CommandError):
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecurityConfig:
     """
     Security configuration for command execution
     """
 
-    allowed_commands: set[str]
-    allowed_flags: set[str]
+    allowed_commands: frozenset[str]
+    allowed_flags: frozenset[str]
     max_command_length: int
     command_timeout: int
     allow_all_commands: bool = False
     allow_all_flags: bool = False
+    resolved_commands: Dict[str, str] = field(default_factory=dict)
 
 
 class CommandExecutor:
-    def __init__(self, allowed_dir: str, security_config: SecurityConfig):
+    __slots__ = ("allowed_dir", "_allowed_dir_prefix", "security_config")
+
+    def __init__(self, allowed_dir: str, security_config: SecurityConfig) -> None:
         if not allowed_dir or not os.path.exists(allowed_dir):
             raise ValueError("Valid ALLOWED_DIR is required")
-        self.allowed_dir = os.path.abspath(os.path.realpath(allowed_dir))
+        self.allowed_dir = os.path.realpath(allowed_dir)
+        # Prefix used for containment checks; the trailing separator keeps '/allowed-evil' out of '/allowed'
+        self._allowed_dir_prefix = self.allowed_dir if self.allowed_dir.endswith(os.sep) else self.allowed_dir + os.sep
         self.security_config = security_config
 
     def _normalize_path(self, path: str) -> str:
@@ -63,12 +80,8 @@ class CommandExecutor:
         Normalizes a path and ensures it's within allowed directory.
         """
         try:
-            if os.path.isabs(path):
-                # If absolute path, check directly
-                real_path = os.path.abspath(os.path.realpath(path))
-            else:
-                # If relative path, combine with allowed_dir first
-                real_path = os.path.abspath(os.path.realpath(os.path.join(self.allowed_dir, path)))
+            # Relative paths are resolved against allowed_dir; os.path.join keeps absolute paths as-is
+            real_path = os.path.realpath(os.path.join(self.allowed_dir, path))
 
             if not self._is_path_safe(real_path):
                 raise CommandSecurityError(f"Path '{path}' is outside of allowed directory: {self.allowed_dir}")
@@ -95,17 +108,24 @@ class CommandExecutor:
                 - List of command arguments (List[str])
 
         Raises:
-            CommandSecurityError: If the command contains unsupported shell operators.
+            CommandSecurityError: If the command exceeds the maximum length or contains
+                unsupported shell operators.
         """
 
+        # Reject oversized input before any scanning or tokenization
+        if len(command_string) > self.security_config.max_command_length:
+            raise CommandSecurityError(f"Command exceeds maximum length of {self.security_config.max_command_length}")
+
         # Check for shell operators that we don't support
-        shell_operators = ["&&", "||", "|", ">", ">>", "<", "<<", ";"]
-        for operator in shell_operators:
-            if operator in command_string:
-                raise CommandSecurityError(f"Shell operator '{operator}' is not supported")
+        operator_match = _SHELL_OPERATOR_RE.search(command_string)
+        if operator_match:
+            raise CommandSecurityError(f"Shell operator '{operator_match.group(0)}' is not supported")
 
         try:
-            parts = shlex.split(command_string)
+            if _SHLEX_QUOTING_RE.search(command_string):
+                parts = shlex.split(command_string)
+            else:
+                parts = _PLAIN_TOKEN_RE.findall(command_string)
             if not parts:
                 raise CommandSecurityError("Empty command")
 
@@ -118,16 +138,16 @@ class CommandExecutor:
             # Process and validate arguments
             validated_args = []
             for arg in args:
-                if arg.startswith("-"):
+                arg_kind = _ARG_KIND_RE.match(arg)
+                kind = arg_kind.lastgroup if arg_kind else None
+
+                if kind == "flag":
                     if not self.security_config.allow_all_flags and arg not in self.security_config.allowed_flags:
                         raise CommandSecurityError(f"Flag '{arg}' is not allowed")
                     validated_args.append(arg)
-                    continue
-
-                # For any path-like argument, validate it
-                if "/" in arg or "\\" in arg or os.path.isabs(arg) or arg == ".":
-                    normalized_path = self._normalize_path(arg)
-                    validated_args.append(normalized_path)
+                elif kind == "path":
+                    # For any path-like argument, validate it
+                    validated_args.append(self._normalize_path(arg))
                 else:
                     # For non-path arguments, add them as-is
                     validated_args.append(arg)
@@ -141,27 +161,18 @@ class CommandExecutor:
         """
         Checks if a given path is safe to access within allowed directory boundaries.
 
-        Validates that the absolute resolved path is within the allowed directory
-        to prevent directory traversal attacks.
+        Validates that the resolved path is the allowed directory itself or lies
+        beneath it, to prevent directory traversal attacks.
 
         Args:
-            path (str): The path to validate.
+            path (str): The path to validate, already resolved with os.path.realpath.
 
         Returns:
             bool: True if path is within allowed directory, False otherwise.
-                Returns False if path resolution fails for any reason.
 
         Private method intended for internal use only.
         """
-        try:
-            # Resolve any symlinks and get absolute path
-            real_path = os.path.abspath(os.path.realpath(path))
-            allowed_dir_real = os.path.abspath(os.path.realpath(self.allowed_dir))
-
-            # Check if the path starts with allowed_dir
-            return real_path.startswith(allowed_dir_real)
-        except Exception:
-            return False
+        return path == self.allowed_dir or path.startswith(self._allowed_dir_prefix)
 
     def execute(self, command_string: str) -> subprocess.CompletedProcess:
         """
@@ -189,14 +200,14 @@ class CommandExecutor:
             - Uses timeout and working directory constraints
             - Captures both stdout and stderr
         """
-        if len(command_string) > self.security_config.max_command_length:
-            raise CommandSecurityError(f"Command exceeds maximum length of {self.security_config.max_command_length}")
-
         try:
             command, args = self.validate_command(command_string)
 
+            # Allowed commands were looked up on PATH at startup; the path goes in executable so argv[0]
+            # stays the bare command name, and None leaves the lookup to the OS
             return subprocess.run(
                 [command] + args,
+                executable=self.security_config.resolved_commands.get(command),
                 shell=False,
                 text=True,
                 capture_output=True,
@@ -211,6 +222,28 @@ class CommandExecutor:
             raise CommandExecutionError(f"Command execution failed: {str(e)}")
 
 
+def _parse_name_list(value: str) -> frozenset[str]:
+    """
+    Splits a comma-separated setting into a frozen set of stripped, interned names.
+    """
+    return frozenset(sys.intern(name.strip()) for name in value.split(",") if name.strip())
+
+
+def _resolve_commands(commands: frozenset[str]) -> Dict[str, str]:
+    """
+    Looks up each command on PATH once, so execution doesn't repeat the search on every call.
+
+    Commands that are not found, or that resolve to a relative path, are left out and
+    resolved by the OS at execution time as before.
+    """
+    resolved = {}
+    for command in commands:
+        path = shutil.which(command)
+        if path and os.path.isabs(path):
+            resolved[command] = path
+    return resolved
+
+
 # Load security configuration from environment
 def load_security_config() -> SecurityConfig:
     """
@@ -222,12 +255,13 @@ def load_security_config() -> SecurityConfig:
 
     Returns:
         SecurityConfig: Configuration object containing:
-            - allowed_commands: Set of permitted command names
-            - allowed_flags: Set of permitted command flags/options
+            - allowed_commands: Frozen set of permitted command names
+            - allowed_flags: Frozen set of permitted command flags/options
             - max_command_length: Maximum length of command string
             - command_timeout: Maximum execution time in seconds
             - allow_all_commands: Whether all commands are allowed
             - allow_all_flags: Whether all flags are allowed
+            - resolved_commands: Absolute executable paths of allowed commands found on PATH
 
     Environment Variables:
         ALLOWED_COMMANDS: Comma-separated list of allowed commands or 'all' (default: "ls,cat,pwd")
@@ -240,54 +274,75 @@ def load_security_config() -> SecurityConfig:
     
     allow_all_commands = allowed_commands.lower() == 'all'
     allow_all_flags = allowed_flags.lower() == 'all'
+    allowed_command_names = frozenset() if allow_all_commands else _parse_name_list(allowed_commands)
     
     return SecurityConfig(
-        allowed_commands=set() if allow_all_commands else set(allowed_commands.split(",")),
-        allowed_flags=set() if allow_all_flags else set(allowed_flags.split(",")),
+        allowed_commands=allowed_command_names,
+        allowed_flags=frozenset() if allow_all_flags else _parse_name_list(allowed_flags),
         max_command_length=int(os.getenv("MAX_COMMAND_LENGTH", "1024")),
         command_timeout=int(os.getenv("COMMAND_TIMEOUT", "30")),
         allow_all_commands=allow_all_commands,
         allow_all_flags=allow_all_flags,
+        resolved_commands=_resolve_commands(allowed_command_names),
     )
 
 
 executor = CommandExecutor(allowed_dir=os.getenv("ALLOWED_DIR", ""), security_config=load_security_config())
 
+# The configuration is fixed for the lifetime of the process, so the descriptive texts and tool list are built once
+_RUN_COMMAND_DESCRIPTION = (
+    f"Allows command (CLI) execution in the directory: {executor.allowed_dir}\n\n"
+    f"Available commands: {'all commands' if executor.security_config.allow_all_commands else ', '.join(executor.security_config.allowed_commands)}\n"
+    f"Available flags: {'all flags' if executor.security_config.allow_all_flags else ', '.join(executor.security_config.allowed_flags)}\n\n"
+    "Note: Shell operators (&&, |, >, >>) are not supported."
+)
+
+_SECURITY_INFO_TEXT = (
+    "Security Configuration:\n"
+    f"==================\n"
+    f"Working Directory: {executor.allowed_dir}\n"
+    f"\nAllowed Commands:\n"
+    f"----------------\n"
+    f"{'All commands allowed' if executor.security_config.allow_all_commands else ', '.join(sorted(executor.security_config.allowed_commands))}\n"
+    f"\nAllowed Flags:\n"
+    f"-------------\n"
+    f"{'All flags allowed' if executor.security_config.allow_all_flags else ', '.join(sorted(executor.security_config.allowed_flags))}\n"
+    f"\nSecurity Limits:\n"
+    f"---------------\n"
+    f"Max Command Length: {executor.security_config.max_command_length} characters\n"
+    f"Command Timeout: {executor.security_config.command_timeout} seconds\n"
+)
+
+_TOOLS = [
+    types.Tool(
+        name="run_command",
+        description=_RUN_COMMAND_DESCRIPTION,
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "Single command to execute (example: 'ls -l' or 'cat file.txt')",
+                }
+            },
+            "required": ["command"],
+        },
+    ),
+    types.Tool(
+        name="show_security_rules",
+        description=("Show what commands and operations are allowed in this environment.\n"),
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+]
+
 
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
-    commands_desc = "all commands" if executor.security_config.allow_all_commands else ", ".join(executor.security_config.allowed_commands)
-    flags_desc = "all flags" if executor.security_config.allow_all_flags else ", ".join(executor.security_config.allowed_flags)
-    
-    return [
-        types.Tool(
-            name="run_command",
-            description=(
-                f"Allows command (CLI) execution in the directory: {executor.allowed_dir}\n\n"
-                f"Available commands: {commands_desc}\n"
-                f"Available flags: {flags_desc}\n\n"
-                "Note: Shell operators (&&, |, >, >>) are not supported."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "Single command to execute (example: 'ls -l' or 'cat file.txt')",
-                    }
-                },
-                "required": ["command"],
-            },
-        ),
-        types.Tool(
-            name="show_security_rules",
-            description=("Show what commands and operations are allowed in this environment.\n"),
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-    ]
+    # Hand out a copy so callers can't alter the shared list
+    return list(_TOOLS)
 
 
 @server.call_tool()
@@ -328,30 +383,12 @@ async def handle_call_tool(name: str, arguments: Optional[Dict[str, Any]]) -> Li
             return [types.TextContent(type="text", text=f"Error: {str(e)}", error=True)]
 
     elif name == "show_security_rules":
-        commands_desc = "All commands allowed" if executor.security_config.allow_all_commands else ", ".join(sorted(executor.security_config.allowed_commands))
-        flags_desc = "All flags allowed" if executor.security_config.allow_all_flags else ", ".join(sorted(executor.security_config.allowed_flags))
-        
-        security_info = (
-            "Security Configuration:\n"
-            f"==================\n"
-            f"Working Directory: {executor.allowed_dir}\n"
-            f"\nAllowed Commands:\n"
-            f"----------------\n"
-            f"{commands_desc}\n"
-            f"\nAllowed Flags:\n"
-            f"-------------\n"
-            f"{flags_desc}\n"
-            f"\nSecurity Limits:\n"
-            f"---------------\n"
-            f"Max Command Length: {executor.security_config.max_command_length} characters\n"
-            f"Command Timeout: {executor.security_config.command_timeout} seconds\n"
-        )
-        return [types.TextContent(type="text", text=security_info)]
+        return [types.TextContent(type="text", text=_SECURITY_INFO_TEXT)]
 
     raise ValueError(f"Unknown tool: {name}")
 
 
-async def main():
+async def main() -> None:
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,